@@ -1,56 +1,179 @@
-import gradio as gr
+from __future__ import annotations
+
 import json
+import os
+import re
 import asyncio
+import contextlib
+import threading
+import time
+
+import aiofiles
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, AsyncGenerator, Callable
 
-# 假设 core.downloader 模块可用
-from core.downloader import (
-    get_work_info_async,
-    process_download_job,
-    load_config,
-    read_log_sync,
-    log_message,
-    search_work_async,
-    process_bulk_download_job
-)
+# 延迟导入：gradio 和 core.downloader 启动开销较大，保持 `import app` 本身轻量
+# (供测试或监控进程导入辅助函数时不必拉起整个 HTTP/UI 栈)
+gr = None
+
+
+def _ensure_imports():
+    """首次构建 UI / 运行处理器前，导入 gradio 与下载核心模块"""
+    global gr, get_work_info_async, process_download_job, load_config, \
+        read_log_sync, log_message, search_work_async, process_bulk_download_job, \
+        invalidate_work_cache, LOG_FILE
+
+    if gr is not None:
+        return
+
+    import gradio
+    gr = gradio
+
+    from core import downloader as _dl
+    get_work_info_async = _dl.get_work_info_async
+    process_download_job = _dl.process_download_job
+    load_config = _dl.load_config
+    read_log_sync = _dl.read_log_sync
+    log_message = _dl.log_message
+    search_work_async = _dl.search_work_async
+    process_bulk_download_job = _dl.process_bulk_download_job
+    invalidate_work_cache = _dl.invalidate_work_cache
+    LOG_FILE = _dl.LOG_FILE
+
+# 可选加速：优先使用 orjson (C 实现，比 stdlib json 快数倍)，缺失时回退 stdlib
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    _loads = json.loads
 
 # --- Configuration & Helpers ---
 CONFIG_FILE = Path("config.json")
-# 存储当前作品文件索引和文件名的映射，用于进度跟踪
-download_progress_map: Dict[str, Dict[int, str]] = {}
+
+# C 级多键取值器，构建 Dataframe 行时避免逐键的 Python 字典查找
+_FILE_COLS = itemgetter('index', 'filename', 'type', 'size_formatted', 'folder_path')
+_SEARCH_COLS = itemgetter('rj_id', 'title', 'author', 'total_tracks')
+
+# RJ ID 归一化：一次正则匹配替代 upper/strip/replace 三连
+_RJ_RE = re.compile(r'^\s*(?:RJ)?(\d+)\s*$', re.IGNORECASE)
+
+
+def _norm_rj(s: str) -> str | None:
+    """把用户输入归一化为 'RJxxxx'，无法解析时返回 None"""
+    m = _RJ_RE.match(s or '')
+    return f"RJ{m.group(1)}" if m else None
+
+
+# 字节数格式化：按 bit_length 直接定位单位，免去逐级比较/除法
+_UNITS = (('B', 0), ('KB', 10), ('MB', 20), ('GB', 30), ('TB', 40))
+
+
+def _human(b: int) -> str:
+    """将字节数格式化为可读字符串 (进度回调热路径使用)"""
+    if b <= 0:
+        return '0 B'
+    unit, shift = _UNITS[min((int(b).bit_length() - 1) // 10, 4)]
+    return f"{b / (1 << shift):.2f} {unit}"
+class _LRUDict(OrderedDict):
+    """容量受限的 dict：超出上限时淘汰最久未写入的条目，防止长期运行内存泄漏"""
+
+    def __init__(self, maxsize: int = 128):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# 存储当前作品文件索引↔文件名的双向映射，用于进度跟踪 (LRU 限容)
+# 结构: {rj_id: {'by_index': {index: filename}, 'by_name': {filename: index}}}
+download_progress_map: _LRUDict = _LRUDict(maxsize=128)
+
+# 进程内配置缓存 (mtime 失效)，避免每次 UI 事件都读盘 + json.loads
+_config_cache: Tuple[float, Dict[str, Any]] | None = None
+_config_cache_lock = threading.Lock()
+
+
+def load_config_cached() -> Dict[str, Any]:
+    """带 mtime 失效的配置读取：文件未变化时直接返回缓存的 dict"""
+    global _config_cache
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime
+    except OSError:
+        return load_config()
+
+    with _config_cache_lock:
+        if _config_cache is not None and _config_cache[0] == mtime:
+            return _config_cache[1]
+        config = load_config()
+        _config_cache = (mtime, config)
+        return config
 
 
 def load_current_config():
     """加载配置并处理目录显示"""
-    current_config = load_config()
+    current_config = load_config_cached()
     return current_config
 
 
 def save_config(config: dict):
-    """同步保存配置并返回状态"""
+    """同步保存配置并返回状态 (写临时文件后原子替换，防止中途崩溃损坏配置)"""
+    global _config_cache
+    tmp_file = CONFIG_FILE.with_suffix(".json.tmp")
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2)
-        current_config = load_config()
-        return "✅ 配置保存成功！请重新启动 Web UI 使部分配置生效。", current_config["output_dir"]
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(_dumps(config))
+            f.flush()
+            # 单次 fsync 保证落盘后再替换，崩溃时不会留下半截配置
+            os.fsync(f.fileno())
+        os.replace(tmp_file, CONFIG_FILE)
+        # 写入后直接用刚保存的 dict 充填缓存，省去一次回读 + 解析
+        with _config_cache_lock:
+            _config_cache = (CONFIG_FILE.stat().st_mtime, config)
+        # 缓存的是过滤后的文件列表，hq_audio_only / default_file_types 等
+        # 配置变更后必须整体失效，否则最近看过的作品仍按旧过滤条件展示
+        _WORK_INFO_CACHE.clear()
+        invalidate_work_cache()
+        return "✅ 配置保存成功！请重新启动 Web UI 使部分配置生效。", config["output_dir"]
     except Exception as e:
+        tmp_file.unlink(missing_ok=True)
         return f"❌ 配置保存失败: {e}", config["output_dir"]
 
 
-def update_config_ui(
+@lru_cache(maxsize=32)
+def _resolve_dir(s: str) -> str:
+    """路径归一化结果缓存：重复保存同一目录时免去 resolve() 的文件系统调用"""
+    return str(Path(s).resolve())
+
+
+async def update_config_ui(
         output_dir: str,
         hq_only: bool,
         file_types: List[str],
         max_concurrent_downloads: int,
+        ui_concurrency: int,
         proxy: str,
         listen_host: str,
         listen_port: str
 ):
     """处理 UI 配置更新逻辑"""
-    current_config = load_config()
+    current_config = load_config_cached()
 
-    new_output_dir = str(Path(output_dir).resolve())
+    new_output_dir = _resolve_dir(output_dir)
 
     try:
         port_num = int(listen_port)
@@ -64,52 +187,94 @@ def update_config_ui(
         "hq_audio_only": hq_only,
         "default_file_types": file_types,
         "max_concurrent_downloads": max_concurrent_downloads,
+        "ui_concurrency": int(ui_concurrency),
         "proxy": proxy.strip(),
         "listen_host": listen_host.strip(),
         "listen_port": port_num
     }
-    return save_config(new_config)
+    # 磁盘写入放到线程池，避免阻塞事件循环
+    return await asyncio.to_thread(save_config, new_config)
+
+
+# 作品信息缓存：{rj_id: (获取时间, files_info_dicts, 标题)}，短 TTL 内重复查看免 API 往返
+_WORK_INFO_CACHE: _LRUDict = _LRUDict(maxsize=64)
+_WORK_INFO_TTL = 300.0
+
+
+def _build_info_outputs(
+        full_rj_id: str,
+        files_info_dicts: List[Dict[str, Any]],
+        title: str,
+        cached: bool = False
+) -> Tuple[List[List[Any]], str, str, List[int]]:
+    """由文件信息列表构建 handle_get_info 的各项输出并登记进度映射"""
+    by_index = dict(zip(
+        (d['index'] for d in files_info_dicts),
+        (d['filename'] for d in files_info_dicts)
+    ))
+    # 同时保存反向映射，进度回调中 O(1) 查索引，避免每次 tick 重建
+    download_progress_map[full_rj_id] = {
+        'by_index': by_index,
+        'by_name': {v: k for k, v in by_index.items()}
+    }
+
+    data_for_dataframe = [list(_FILE_COLS(item)) for item in files_info_dicts]
+    selected_indices = [item['index'] for item in files_info_dicts]
+    status = "✅ 成功获取文件列表。(缓存)" if cached else "✅ 成功获取文件列表。"
+
+    return data_for_dataframe, status, title, selected_indices
 
 
 # 异步函数：获取信息
-async def handle_get_info(rj_id: str) -> Tuple[List[List[Any]], str, str]:
-    """处理“获取信息”按钮点击事件，获取文件列表并转换为 Dataframe 格式。"""
+async def handle_get_info(rj_id: str, force_refresh: bool = False) -> Tuple[List[List[Any]], str, str, List[int]]:
+    """
+    处理“获取信息”按钮点击事件，获取文件列表并转换为 Dataframe 格式。
+    第四个返回值是自动全选的文件索引列表，直接绑定到 selected_indices_state，
+    省去事件链中额外的一次回调派发。
+    """
     if not rj_id:
-        return [], "❌ 错误: RJ ID 不能为空。", "无法获取信息"
+        return [], "❌ 错误: RJ ID 不能为空。", "无法获取信息", []
 
-    rj_id = rj_id.upper().strip().replace("RJ", "")
-    full_rj_id = f"RJ{rj_id}"
+    full_rj_id = _norm_rj(rj_id)
+    if full_rj_id is None:
+        return [], f"❌ 错误: 无法解析 RJ ID '{rj_id}'。", "无法获取信息", []
+
+    if not force_refresh:
+        cached = _WORK_INFO_CACHE.get(full_rj_id)
+        if cached is not None and time.monotonic() - cached[0] < _WORK_INFO_TTL:
+            return _build_info_outputs(full_rj_id, cached[1], cached[2], cached=True)
+    else:
+        # 强制刷新要同时穿透核心模块的作品缓存，否则仍会拿到最长 10 分钟的旧数据
+        invalidate_work_cache(full_rj_id)
 
     try:
         files_info_dicts, title_or_error = await get_work_info_async(full_rj_id)
 
         if files_info_dicts:
-            global download_progress_map
-            download_progress_map[full_rj_id] = {item['index']: item['filename'] for item in files_info_dicts}
-
-            data_for_dataframe = [
-                [
-                    item['index'],
-                    item['filename'],
-                    item['type'],
-                    item['size_formatted'],
-                    item['folder_path']
-                ] for item in files_info_dicts
-            ]
-
-            return data_for_dataframe, "✅ 成功获取文件列表。", title_or_error
+            _WORK_INFO_CACHE[full_rj_id] = (time.monotonic(), files_info_dicts, title_or_error)
+            return _build_info_outputs(full_rj_id, files_info_dicts, title_or_error)
         else:
-            return [], f"❌ 获取信息失败: {title_or_error}", "无法获取信息"
+            return [], f"❌ 获取信息失败: {title_or_error}", "无法获取信息", []
 
     except Exception as e:
         await log_message(f"Critical error in handle_get_info for {full_rj_id}: {e}")
-        return [], f"❌ 严重错误: {e}", "无法获取信息"
+        return [], f"❌ 严重错误: {e}", "无法获取信息", []
 
 
-def format_progress_data(rj_id: str, filename: str, downloaded: int, total: int) -> Tuple[str, str, float]:
-    """格式化进度数据，供 Gradio Markdown 和 Progress 使用"""
-    index_map = {v: k for k, v in download_progress_map.get(rj_id, {}).items()}
-    index = index_map.get(filename, 0)
+# 进度行/表头模板：避免每次 tick 重新解析相同的 f-string 格式说明符
+_ROW_TMPL = (
+    "{icon} **文件 {idx}**: {fn}...\n"
+    "   - **状态**: {st} | **进度**: {pct:.2f}% | **大小**: {dl} / {tot}"
+)
+_HEADER_TMPL = (
+    "**--- 任务状态 (RJ{rj}) ---**\n"
+    "**总进度:** 已完成 **{done}** / **{total}** 个文件"
+)
+
+
+def format_progress_data(rj_id: str, filename: str, downloaded: int, total: int) -> Tuple[str, float]:
+    """格式化进度数据，返回 (渲染好的 Markdown 行, 进度百分比)"""
+    index = download_progress_map.get(rj_id, {}).get('by_name', {}).get(filename, 0)
 
     status_icon = "⚪"
     status_text = "等待中"
@@ -129,27 +294,23 @@ def format_progress_data(rj_id: str, filename: str, downloaded: int, total: int)
             status_icon = "🔵"
             status_text = "排队/连接中"
 
-    def bytes_to_human(b):
-        if b < 1024 * 1024: return f"{b / 1024:.2f} KB"
-        if b < 1024 * 1024 * 1024: return f"{b / (1024 * 1024):.2f} MB"
-        return f"{b / (1024 * 1024 * 1024):.2f} GB"
-
-    # 美化后的状态字符串
-    status_str = f"{status_icon} **文件 {index}**: {filename[:40]}..."
+    rendered_row = _ROW_TMPL.format_map({
+        'icon': status_icon,
+        'idx': index,
+        'fn': filename[:40],
+        'st': status_text,
+        'pct': progress_percent * 100,
+        'dl': _human(downloaded),
+        'tot': _human(total),
+    })
 
-    # 美化后的进度字符串
-    progress_str = (
-        f"**状态**: {status_text} | **进度**: {progress_percent * 100:.2f}% | "
-        f"**大小**: {bytes_to_human(downloaded)} / {bytes_to_human(total)}"
-    )
-
-    return status_str, progress_str, progress_percent
+    return rendered_row, progress_percent
 
 
 # 异步生成器函数：处理单个 RJ ID 下载任务 (实现实时更新)
 async def handle_download(
         rj_id: str,
-        selected_indices_json: str,
+        selected_indices: List[int],
         progress: gr.Progress,
 ) -> AsyncGenerator[gr.update, None]:
     """处理单个 RJ ID 下载任务，通过 yield 实时更新进度 Textbox"""
@@ -158,11 +319,15 @@ async def handle_download(
         yield gr.update(value="❌ 错误: RJ ID 不能为空。")
         return
 
-    rj_id = rj_id.upper().strip().replace("RJ", "")
-    full_rj_id = f"RJ{rj_id}"
+    full_rj_id = _norm_rj(rj_id)
+    if full_rj_id is None:
+        yield gr.update(value=f"❌ 错误: 无法解析 RJ ID '{rj_id}'。")
+        return
 
     try:
-        selected_indices = json.loads(selected_indices_json)
+        # 兼容旧的 JSON 字符串 state
+        if isinstance(selected_indices, str):
+            selected_indices = _loads(selected_indices)
 
         if not selected_indices:
             yield gr.update(value="⚠️ 没有文件被选中。请先获取文件列表。")
@@ -170,56 +335,81 @@ async def handle_download(
 
         yield gr.update(value=f"正在启动下载任务 (RJ{full_rj_id})...")
 
-        current_file_progress: Dict[str, Tuple[str, str, float]] = {}
+        # filename → 预渲染好的 Markdown 行；只改动有进度的条目，yield 时一次 join
+        progress_lines: Dict[str, str] = {}
+        file_pct: Dict[str, float] = {}
+        completed_count = 0
         total_files = len(selected_indices)
 
+        # 事件驱动更新：只有进度真正变化时才重绘，避免空转轮询
+        loop = asyncio.get_running_loop()
+        update_evt = asyncio.Event()
+
+        # 每个文件的 (上次发射时间, 上次进度)，用于合并过于密集的回调
+        last_emit: Dict[str, Tuple[float, float]] = {}
+
         def progress_callback(rj_id_local: str, filename: str, downloaded: int, total: int):
-            """同步进度回调，用于更新内部状态"""
-            status_str, progress_str, progress_percent = format_progress_data(
+            """同步进度回调，用于更新内部状态（线程安全地通知主循环）"""
+            # 节流：50ms 内且进度变化 <1% 的更新直接丢弃（最终 100% 始终发射）
+            now = time.monotonic()
+            pct = downloaded / total if total else 0.0
+            prev_ts, prev_pct = last_emit.get(filename, (0.0, -1.0))
+            if pct < 0.999 and now - prev_ts < 0.05 and abs(pct - prev_pct) < 0.01:
+                return
+            last_emit[filename] = (now, pct)
+
+            # 在回调中就渲染好整行，主循环只需 join
+            rendered_line, progress_percent = format_progress_data(
                 rj_id_local, filename, downloaded, total
             )
-            current_file_progress[filename] = (status_str, progress_str, progress_percent)
 
-            # 更新 Gradio 内部进度条 (总任务进度)
-            completed_count = sum(1 for _, _, p in current_file_progress.values() if p >= 0.999)
-            total_progress_percent = completed_count / total_files
+            def _apply():
+                nonlocal completed_count
+                # 增量维护完成计数，避免每次全量扫描
+                prev_pct = file_pct.get(filename, 0.0)
+                if prev_pct < 0.999 <= progress_percent:
+                    completed_count += 1
+                file_pct[filename] = progress_percent
+                progress_lines[filename] = rendered_line
+                update_evt.set()
 
-            if progress and callable(progress):
-                progress(total_progress_percent,
-                         desc=f"文件下载中: {filename[:25]}... ({total_progress_percent * 100:.1f}%)")
+                # 更新 Gradio 内部进度条 (总任务进度)
+                total_progress_percent = completed_count / total_files
+
+                if progress and callable(progress):
+                    progress(total_progress_percent,
+                             desc=f"文件下载中: {filename[:25]}... ({total_progress_percent * 100:.1f}%)")
+
+            # 回调可能来自工作线程，统一调度回事件循环
+            loop.call_soon_threadsafe(_apply)
 
         # 启动下载任务
         process_task = asyncio.create_task(
             process_download_job(full_rj_id, selected_indices, progress_callback)
         )
 
-        # 实时更新循环：每 0.5 秒更新一次 Textbox
-        while not process_task.done():
-            progress_output_lines = [f"**--- 任务状态 (RJ{full_rj_id}) ---**"]
-
-            completed_count = 0
-
-            # 排序文件，让完成的文件排在前面
-            sorted_progress = sorted(
-                current_file_progress.items(),
-                key=lambda item: item[1][2],
-                reverse=True  # 进度高的（完成的）排在前面
-            )
-
-            for filename, (status_str, progress_str, progress_percent) in sorted_progress:
-                # 使用 Markdown 列表嵌套，美观且清晰
-                progress_output_lines.append(f"{status_str}\n   - {progress_str}")
-                if progress_percent >= 0.999:
-                    completed_count += 1
-
-            progress_output_lines.insert(
-                1,
-                f"**总进度:** 已完成 **{completed_count}** / **{total_files}** 个文件"
-            )
-
-            yield gr.update(value="\n".join(progress_output_lines))
-
-            await asyncio.sleep(0.5)
+        try:
+            # 实时更新循环：等待进度事件（最长 0.5 秒兜底刷新一次）
+            while not process_task.done():
+                try:
+                    await asyncio.wait_for(update_evt.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    pass
+                update_evt.clear()
+
+                header = _HEADER_TMPL.format_map({
+                    'rj': full_rj_id,
+                    'done': completed_count,
+                    'total': total_files,
+                })
+                yield gr.update(value=header + "\n" + "\n".join(progress_lines.values()))
+        finally:
+            # 客户端断开或取消时，Gradio 会 aclose() 本生成器 (GeneratorExit)，
+            # 必须把后台下载任务一并取消，否则它会继续占用带宽和并发额度
+            if not process_task.done():
+                process_task.cancel()
+                with contextlib.suppress(BaseException):
+                    await process_task
 
         # 任务完成后，获取结果
         try:
@@ -229,7 +419,7 @@ async def handle_download(
             success = False
 
         if success:
-            final_message = f"✅ **下载任务完成！** (RJ{full_rj_id})。所有 {total_files} 个文件已下载到：{load_config()['output_dir']}/{full_rj_id}"
+            final_message = f"✅ **下载任务完成！** (RJ{full_rj_id})。所有 {total_files} 个文件已下载到：{load_config_cached()['output_dir']}/{full_rj_id}"
             if progress and callable(progress):
                 progress(1.0, desc=f"下载完成: RJ{full_rj_id}")
         else:
@@ -237,7 +427,8 @@ async def handle_download(
 
         yield gr.update(value=final_message)
 
-    except json.JSONDecodeError:
+    except ValueError:
+        # orjson.JSONDecodeError / json.JSONDecodeError 均为 ValueError 子类
         yield gr.update(value="❌ 错误: 无法解析选中的文件索引。")
     except Exception as e:
         await log_message(f"Fatal error in handle_download for {rj_id}: {e}")
@@ -245,14 +436,16 @@ async def handle_download(
 
 
 # 异步生成器函数：处理通用批量下载任务 (已修改为实时进度)
-async def handle_bulk_download(rj_ids_json: str, progress: gr.Progress) -> AsyncGenerator[str, None]:
+async def handle_bulk_download(rj_ids: List[str], progress: gr.Progress) -> AsyncGenerator[str, None]:
     """
     处理搜索结果列表的批量下载任务 (作品顺序下载)，
     通过 yield 语句实时更新 bulk_download_status。
     """
     try:
-        rj_ids = json.loads(rj_ids_json)
-    except json.JSONDecodeError:
+        # 兼容旧的 JSON 字符串 state
+        if isinstance(rj_ids, str):
+            rj_ids = _loads(rj_ids)
+    except ValueError:
         yield "❌ 错误：无法解析 RJ ID 列表。"
         return
 
@@ -265,13 +458,29 @@ async def handle_bulk_download(rj_ids_json: str, progress: gr.Progress) -> Async
     # 存储最新的状态消息，用于在循环中 yield
     latest_status_message: str = f"找到 {total_works} 个作品。开始按顺序处理..."
 
-    def overall_progress_callback(current_work_index: int, total_works: int, status_message: str):
-        """整体进度回调，更新 Gradio 进度条，并更新 latest_status_message"""
+    # 进度更新经由事件循环统一派发，pending 槽位只保留最新一帧（合并过期帧）
+    loop = asyncio.get_running_loop()
+    pending: List = [None]
+
+    def _flush():
         nonlocal latest_status_message
+        item = pending[0]
+        pending[0] = None
+        if item is None:
+            return
+        percent, status_message = item
         latest_status_message = status_message
 
+        if progress and callable(progress):
+            # 持续更新 Gradio 内部进度条的描述
+            progress(percent, desc=f"批量下载进度: {status_message}")
+
+    # (上次投递时间, 上次整百分比)，限制高频的文件级进度消息
+    _last_emit = [0.0, -1]
+
+    def overall_progress_callback(current_work_index: int, total_works: int, status_message: str):
+        """整体进度回调：线程安全地投递最新状态，过期帧直接被覆盖"""
         if total_works > 0:
-            # 使用一个小的偏移量来确保 Gradio 进度条可以更新
             percent = (current_work_index / total_works)
         else:
             percent = 0.0
@@ -279,9 +488,19 @@ async def handle_bulk_download(rj_ids_json: str, progress: gr.Progress) -> Async
         if percent > 0.999:
             percent = 1.0
 
-        if progress and callable(progress):
-            # 持续更新 Gradio 内部进度条的描述
-            progress(percent, desc=f"批量下载进度: {status_message}")
+        # 节流：进度整百分比未变化且距上次投递 <100ms 的帧直接丢弃（完成帧除外）
+        now = time.monotonic()
+        pct_int = int(percent * 100)
+        if percent < 1.0 and now - _last_emit[0] < 0.1 and pct_int == _last_emit[1]:
+            return
+        _last_emit[0] = now
+        _last_emit[1] = pct_int
+
+        # 若已有待刷新的帧，覆盖即可，不再重复调度
+        need_schedule = pending[0] is None
+        pending[0] = (percent, status_message)
+        if need_schedule:
+            loop.call_soon_threadsafe(_flush)
 
     yield latest_status_message  # 初始状态
 
@@ -303,8 +522,8 @@ async def handle_bulk_download(rj_ids_json: str, progress: gr.Progress) -> Async
         success = False
         final_message = f"❌ 严重错误：{e}"
 
-    if progress and callable(progress):
-        progress(1.0, desc=f"批量下载完成: {final_message}")
+    # 进度条的最终 1.0 由 overall_progress_callback 在最后一个作品完成时发射，
+    # 这里不再重复触发一次 Gradio 往返
 
     if success:
         yield f"✅ **批量下载任务完成！** {final_message}"
@@ -312,44 +531,48 @@ async def handle_bulk_download(rj_ids_json: str, progress: gr.Progress) -> Async
         yield f"❌ **批量下载任务未完全成功：** {final_message}"
 
 
-async def handle_search(keyword: str, page: str, size: str) -> Tuple[List[List[Any]], str]:
-    """处理关键词搜索"""
+async def handle_search(keyword: str, page: str, size: str) -> Tuple[List[List[Any]], str, List[str], str]:
+    """
+    处理关键词搜索。
+    直接返回 RJ ID 列表和计数，免去事件链中对结果的二次遍历/解析。
+    """
     if not keyword:
-        return [], "请输入关键词进行搜索。"
+        return [], "请输入关键词进行搜索。", [], "0"
 
-    try:
-        page_num = int(page)
-        size_num = int(size)
-    except ValueError:
-        return [], "页码和每页数量必须是数字。"
+    # 在发起任何 API 请求之前就拦截非法输入
+    page = (page or "").strip()
+    size = (size or "").strip()
+    if not (page.isdigit() and size.isdigit()):
+        return [], "页码和每页数量必须是数字。", [], "0"
+
+    page_num = int(page)
+    size_num = int(size)
+    if page_num < 1:
+        return [], "页码必须大于等于 1。", [], "0"
+    if not 1 <= size_num <= 100:
+        return [], "每页数量必须在 1 到 100 之间。", [], "0"
 
     try:
         results_dicts, total_pages = await search_work_async(keyword, page_num, size_num)
 
         if not results_dicts:
-            return [], f"❌ 未找到关键词 '{keyword}' 的相关作品。"
+            return [], f"❌ 未找到关键词 '{keyword}' 的相关作品。", [], "0"
 
         # --- BUG FIX CORE: 强制裁剪结果列表到请求的数量 (size_num) ---
         # 即使 API 已经返回了正确数量，这一步作为最后的防线，确保前端不会收到超过期望的行数
         # 从而避免 Gradio Dataframe 默认只显示前 N 行的问题
         display_results = results_dicts[:size_num]
 
-        data_for_dataframe = [
-            [
-                item['rj_id'],
-                item['title'],
-                item['author'],
-                item['total_tracks']
-            ] for item in display_results  # 使用裁剪后的列表
-        ]
+        data_for_dataframe = [list(_SEARCH_COLS(item)) for item in display_results]  # 使用裁剪后的列表
 
         # 状态信息使用实际显示的行数
         status_msg = f"✅ 搜索成功！显示 {len(display_results)} 个结果。总页数: {total_pages}。"
-        return data_for_dataframe, status_msg
+        rj_ids = [item['rj_id'] for item in display_results]
+        return data_for_dataframe, status_msg, rj_ids, str(len(rj_ids))
 
     except Exception as e:
         await log_message(f"Search failed for '{keyword}': {e}")
-        return [], f"❌ 搜索失败: {e}"
+        return [], f"❌ 搜索失败: {e}", [], "0"
 
 
 def extract_rj_id_from_selection_event(evt: gr.SelectData, search_data: List[List[Any]]) -> str:
@@ -361,14 +584,58 @@ def extract_rj_id_from_selection_event(evt: gr.SelectData, search_data: List[Lis
     return ""
 
 
-def get_latest_log() -> str:
-    """用于刷新日志的回调函数"""
-    return read_log_sync(lines=200)
+async def handle_search_row_select(
+        evt: gr.SelectData,
+        search_data: List[List[Any]]
+) -> Tuple[str, List[List[Any]], str, str, List[int]]:
+    """
+    点击搜索结果行：提取 RJ ID 并直接获取文件信息。
+    合并为单个回调，避免事件链上的多次 Gradio 往返。
+    """
+    rj_id = extract_rj_id_from_selection_event(evt, search_data)
+    if not rj_id:
+        return "", [], "❌ 未能从选中行解析 RJ ID。", "无法获取信息", []
+
+    table, status, title, indices = await handle_get_info(rj_id)
+    return rj_id, table, status, title, indices
+
+
+# 日志尾部缓存：key 为 (mtime_ns, size)，日志未追加时刷新等同于无操作
+_log_cache: Tuple[Tuple[int, int], str] | None = None
+
+
+async def get_latest_log() -> str:
+    """用于刷新日志的回调函数：只异步读取文件尾部，避免阻塞事件循环"""
+    global _log_cache
+    try:
+        stat = os.stat(LOG_FILE)
+        size = stat.st_size
+    except OSError:
+        return "日志文件不存在。"
+
+    cache_key = (stat.st_mtime_ns, size)
+    if _log_cache is not None and _log_cache[0] == cache_key:
+        return _log_cache[1]
+
+    try:
+        # 只读最后 64 KiB，日志再大刷新耗时也不变
+        async with aiofiles.open(LOG_FILE, 'rb') as f:
+            await f.seek(max(0, size - 65536))
+            data = await f.read()
+
+        lines = data.decode('utf-8', 'replace').splitlines(keepends=True)
+        # 与 read_log_sync 保持一致：最新的行在最前面
+        result = "".join(reversed(lines[-200:]))
+        _log_cache = (cache_key, result)
+        return result
+    except Exception as e:
+        return f"读取日志失败: {e}"
 
 
 # --- Gradio UI Definition ---
 
 def create_ui():
+    _ensure_imports()
     current_config = load_current_config()
     default_proxy = current_config.get("proxy", "")
     default_host = current_config.get("listen_host", "127.0.0.1")
@@ -406,6 +673,14 @@ def create_ui():
                     value=max_concurrents,
                     scale=1
                 )
+                config_ui_concurrency = gr.Slider(
+                    label="Web UI 并发请求数 (重启生效)",
+                    minimum=1,
+                    maximum=16,
+                    step=1,
+                    value=current_config.get("ui_concurrency", 4),
+                    scale=1
+                )
 
             config_proxy = gr.Textbox(
                 label="下载代理 (Proxy)",
@@ -446,6 +721,7 @@ def create_ui():
                     config_hq_only,
                     config_file_types,
                     config_max_concurrent,
+                    config_ui_concurrency,
                     config_proxy,
                     config_listen_host,
                     config_listen_port
@@ -469,10 +745,15 @@ def create_ui():
                 )
                 get_info_btn = gr.Button("🔍 获取文件信息", variant="primary", scale=1)
 
+            force_refresh_checkbox = gr.Checkbox(
+                label="强制刷新 (忽略 5 分钟内的缓存)",
+                value=False
+            )
+
             rj_title = gr.Textbox(label="作品标题", interactive=False, value="等待输入...", elem_id="rj_title")
             status_message = gr.Markdown("状态信息：准备就绪。", elem_id="status_message")
 
-            selected_indices_state = gr.State(value="[]")
+            selected_indices_state = gr.State(value=[])
 
             file_list_table = gr.Dataframe(
                 headers=["Index", "Filename", "Type", "Size", "Folder Path"],
@@ -487,13 +768,8 @@ def create_ui():
 
             get_info_btn.click(
                 handle_get_info,
-                inputs=[rj_id_input],
-                outputs=[file_list_table, status_message, rj_title]
-            ).success(
-                lambda data: json.dumps([item[0] for item in data]),
-                inputs=[file_list_table],
-                outputs=[selected_indices_state],
-                queue=False
+                inputs=[rj_id_input, force_refresh_checkbox],
+                outputs=[file_list_table, status_message, rj_title, selected_indices_state]
             )
 
             download_btn = gr.Button("🚀 开始下载全部文件", variant="stop")
@@ -534,7 +810,7 @@ def create_ui():
 
             search_status_message = gr.Markdown("状态：等待搜索...")
 
-            all_rj_ids_state = gr.State(value="[]")
+            all_rj_ids_state = gr.State(value=[])
 
             search_result_table = gr.Dataframe(
                 headers=["RJ ID", "作品标题", "作者", "音轨数"],
@@ -566,40 +842,25 @@ def create_ui():
             search_btn.click(
                 handle_search,
                 inputs=[search_keyword, search_page, search_size],
-                outputs=[search_result_table, search_status_message]
-            ).success(
-                # 将 Dataframe 的第一列 (RJ ID) 提取出来保存到 state
-                lambda data: json.dumps([item[0] for item in data]),
-                inputs=[search_result_table],
-                outputs=[all_rj_ids_state],
-                queue=False
-            ).success(
-                # 更新列表计数显示
-                lambda rj_ids_json: str(len(json.loads(rj_ids_json))),
-                inputs=[all_rj_ids_state],
-                outputs=[list_count_display],
-                queue=False
+                outputs=[
+                    search_result_table,
+                    search_status_message,
+                    all_rj_ids_state,
+                    list_count_display
+                ]
             )
 
-            # 搜索结果点击事件 (联动到下载区)
+            # 搜索结果点击事件 (联动到下载区)：单次回调完成填充 + 获取信息
             search_result_table.select(
-                extract_rj_id_from_selection_event,
+                handle_search_row_select,
                 inputs=[search_result_table],
-                outputs=[rj_id_input],
-                queue=False
-            ).success(
-                handle_get_info,
-                inputs=[rj_id_input],
                 outputs=[
+                    rj_id_input,
                     file_list_table,
                     status_message,
-                    rj_title
+                    rj_title,
+                    selected_indices_state
                 ]
-            ).success(
-                lambda data: json.dumps([item[0] for item in data]),
-                inputs=[file_list_table],
-                outputs=[selected_indices_state],
-                queue=False
             )
 
             # 批量下载按钮点击事件
@@ -630,8 +891,9 @@ def create_ui():
 
 
 if __name__ == "__main__":
+    _ensure_imports()
     ui = create_ui()
-    config = load_config()
+    config = load_config_cached()
     host = config.get("listen_host", "127.0.0.1")
     port = config.get("listen_port", 7683)
 
@@ -643,6 +905,9 @@ if __name__ == "__main__":
 
     print(f"🚀 正在启动 Web UI，监听地址: {host}:{port}")
 
+    # 提升下载端点的并发上限：多个用户/多次点击不再串行排队
+    ui.queue(default_concurrency_limit=config.get("ui_concurrency", 4), max_size=64)
+
     ui.launch(server_name=host, server_port=port, inbrowser=True, show_api=False)
 
     print("Web UI 服务器已正常关闭。")
\ No newline at end of file
@@ -9,23 +9,36 @@ from pathlib import Path
 TEST_RJ_ID = "RJ01396119"  # <<<<<<<< 请修改此处为实际的 RJ ID
 
 
-def print_progress(rj_id: str, filename: str, downloaded: int, total: int):
-    """一个简单的同步进度回调函数，用于控制台输出"""
-    if total > 0:
-        percent = (downloaded / total) * 100
-        total_mb = total / (1024 * 1024)
-        downloaded_mb = downloaded / (1024 * 1024)
-        # 实时打印进度，使用 \r 回到行首
-        sys.stdout.write(
-            f"\r[Download] {rj_id}: {filename[:30]}... "
-            f"({downloaded_mb:.2f} MB / {total_mb:.2f} MB) {percent:.2f}%"
-        )
-        sys.stdout.flush()
-    elif downloaded > 0 and total == 0:
-        # 下载完成，换行
-        print(f"\n[Finished] {rj_id}: {filename}")
-    else:
-        print(f"[Starting] {rj_id}: {filename}")
+# 预编译的进度行模板，避免每个 chunk 都重新构造 f-string
+_TMPL = "\r[Download] {rj}: {fn:<30.30}... ({d:6.2f} MB / {t:6.2f} MB) {p:6.2f}%"
+
+
+def make_print_progress():
+    """
+    构造一个简单的同步进度回调函数，用于控制台输出。
+    只有整数百分比变化时才写/刷新 stdout，避免每个 chunk 一次 flush 系统调用。
+    """
+    last_pct_int = [-1]
+
+    def print_progress(rj_id: str, filename: str, downloaded: int, total: int):
+        if total > 0:
+            percent = (downloaded / total) * 100
+            pct_int = int(percent)
+            if pct_int == last_pct_int[0] and downloaded != total:
+                return
+            last_pct_int[0] = pct_int
+            sys.stdout.write(_TMPL.format(
+                rj=rj_id, fn=filename,
+                d=downloaded / (1024 * 1024), t=total / (1024 * 1024), p=percent
+            ))
+            sys.stdout.flush()
+        elif downloaded > 0 and total == 0:
+            # 下载完成，换行
+            print(f"\n[Finished] {rj_id}: {filename}")
+        else:
+            print(f"[Starting] {rj_id}: {filename}")
+
+    return print_progress
 
 
 async def run_test():
@@ -56,7 +69,7 @@ async def run_test():
     success = await process_download_job(
         TEST_RJ_ID,
         selected_indices,
-        print_progress
+        make_print_progress()
     )
 
     if success:
@@ -1,6 +1,7 @@
 import re
 import os
 import random
+import time
 import aiohttp
 import asyncio
 # 确保 aiofiles 被正确导入，解决 NameError
@@ -11,6 +12,14 @@ from pathlib import Path
 from typing import Dict, Any, List, Tuple, Callable
 from math import ceil
 
+# 可选加速：优先使用 orjson (C 实现，比 stdlib json 快数倍)，缺失时回退 stdlib
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # --- 全局常量和配置 ---
 
 BASE_URLS = [
@@ -37,22 +46,98 @@ def log_message_sync(message: str):
         print(f"Error writing to log (sync): {e}")
 
 
+# --- 异步日志队列：热路径只进队，后台任务批量落盘 ---
+
+_LOG_QUEUE: "asyncio.Queue[str] | None" = None
+_LOG_TASK: asyncio.Task | None = None
+_LOG_LOOP: asyncio.AbstractEventLoop | None = None
+_LOG_FLUSH_INTERVAL = 0.5
+
+
+async def _log_consumer():
+    """后台日志消费者：聚合约 0.5 秒内到达的消息，共用一个句柄一次写盘"""
+    queue = _LOG_QUEUE
+    pending: List[str] = []
+    try:
+        async with aiofiles.open(LOG_FILE, "a", encoding="utf-8") as f:
+            while True:
+                pending = [await queue.get()]
+                # 等一个批次窗口，把期间积累的消息合并成一次写
+                await asyncio.sleep(_LOG_FLUSH_INTERVAL)
+                while not queue.empty():
+                    pending.append(queue.get_nowait())
+                await f.write("".join(pending))
+                await f.flush()
+                pending = []
+    except asyncio.CancelledError:
+        # 事件循环关闭：把批次中 + 队列里尚未落盘的行同步写掉再退出，
+        # 否则各任务最后的 summary 日志会随取消一起丢失
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        if pending:
+            try:
+                with open(LOG_FILE, "a", encoding="utf-8") as f:
+                    f.write("".join(pending))
+            except Exception as e:
+                print(f"Error writing to log (drain): {e}")
+        raise
+    except Exception as e:
+        # 兜底防止日志消费者静默死亡
+        print(f"Error in log consumer: {e}")
+
+
+def _log_enqueue(message: str):
+    """
+    进队即返回的日志写入（需在事件循环内调用）。
+    消费者懒启动；每个新事件循环（如 asyncio.run 反复调用）重建一次。
+    """
+    global _LOG_QUEUE, _LOG_TASK, _LOG_LOOP
+    line = f"[{datetime.now().isoformat()}] {message}\n"
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 不在事件循环内，退回同步写
+        log_message_sync(message)
+        return
+
+    if _LOG_TASK is None or _LOG_TASK.done() or _LOG_LOOP is not loop:
+        _LOG_QUEUE = asyncio.Queue()
+        _LOG_LOOP = loop
+        _LOG_TASK = loop.create_task(_log_consumer())
+    _LOG_QUEUE.put_nowait(line)
+
+
 async def log_message(message: str):
-    """异步写入日志，主要用于 API 请求和 UI 逻辑"""
-    # 使用 asyncio.to_thread 确保同步 I/O 不阻塞事件循环
-    await asyncio.to_thread(log_message_sync, message)
+    """异步写入日志，主要用于 API 请求和 UI 逻辑（进队即返回，批量落盘）"""
+    _log_enqueue(message)
+
+
+def tail_lines(path: Path, n: int = 200, block: int = 64 * 1024) -> List[str]:
+    """
+    从文件末尾反向按块读取，凑够 n 行即停。
+    I/O 量只与尾部大小相关，与日志总大小无关。
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            read_size = min(block, pos)
+            pos -= read_size
+            f.seek(pos)
+            buf = f.read(read_size) + buf
+
+    return buf.decode("utf-8", errors="replace").splitlines(keepends=True)[-n:]
 
 
 def read_log_sync(lines: int = 200) -> str:
-    """同步读取日志文件（倒序）"""
+    """同步读取日志文件（倒序），只扫描文件尾部"""
     try:
         if not LOG_FILE.exists():
             return "日志文件不存在。"
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            all_lines = f.readlines()
 
         # 返回最新的 n 行
-        return "".join(reversed(all_lines[-lines:]))
+        return "".join(reversed(tail_lines(LOG_FILE, lines)))
     except Exception as e:
         return f"读取日志失败: {e}"
 
@@ -64,6 +149,12 @@ def load_config() -> Dict[str, Any]:
         "hq_audio_only": False,
         "default_file_types": ["audio", "image", "text"],
         "max_concurrent_downloads": 3,
+        "max_parallel_works": 2,
+        "metadata_concurrency": 4,
+        "limit_per_host": 16,
+        "download_chunk_kb": 1024,
+        "writer_backend": "executor",
+        "ui_concurrency": 4,
         "proxy": "",
         "listen_host": "127.0.0.1",
         "listen_port": 7683
@@ -72,7 +163,7 @@ def load_config() -> Dict[str, Any]:
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                 # 使用 strip() 去除 BOM，防止解析错误
-                config = json.loads(f.read().strip())
+                config = _loads(f.read().strip())
                 return {**default_config, **config}
         except Exception as e:
             print(f"Error loading config file: {e}. Using default config.")
@@ -80,23 +171,51 @@ def load_config() -> Dict[str, Any]:
     return default_config
 
 
+# 进程内配置缓存：(mtime_ns, 解析结果)。热路径（每次请求/每个文件）反复读配置时命中内存
+_CONFIG_CACHE: Tuple[int, Dict[str, Any]] | None = None
+
+
+def get_cached_config() -> Dict[str, Any]:
+    """带 mtime 失效的配置读取，文件未变化时跳过磁盘读和 JSON 解析"""
+    global _CONFIG_CACHE
+    try:
+        mtime_ns = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return load_config()
+
+    if _CONFIG_CACHE is not None and _CONFIG_CACHE[0] == mtime_ns:
+        return _CONFIG_CACHE[1]
+
+    config = load_config()
+    _CONFIG_CACHE = (mtime_ns, config)
+    return config
+
+
+# 单位表：(名称, 位移量)。用 bit_length 直接定位单位，替代逐级除法循环
+_SIZE_UNITS = (('B', 0), ('KB', 10), ('MB', 20), ('GB', 30), ('TB', 40))
+
+
 def format_size(size_bytes: int) -> str:
-    """将字节数格式化为可读的字符串"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} TB"
+    """将字节数格式化为可读的字符串（进度回调热路径使用）"""
+    if size_bytes <= 0:
+        return "0.00 B"
+    unit, shift = _SIZE_UNITS[min((int(size_bytes).bit_length() - 1) // 10, 4)]
+    return f"{size_bytes / (1 << shift):.2f} {unit}"
 
 
 # --- 辅助函数：路径/文件清理 ---
 
+# Windows 非法字符 -> 空格 的翻译表；str.translate 比等价的 re.sub 快 3-5 倍，
+# 而 sanitize_filename 在每个文件/目录上都会被调用
+_TRANS = str.maketrans({c: ' ' for c in '\\/:*?"<>|'})
+
+
 def sanitize_filename(name: str) -> str:
     """
     清理路径中的非法字符，并安全地保留文件扩展名。
     """
     # 1. 移除或替换 Windows 非法字符 \ / : * ? " < > |
-    safe_name = re.sub(r'[\\/:*?"<>|]', ' ', name).strip()
+    safe_name = name.translate(_TRANS).strip()
 
     # 2. 移除连续的点（.. -> _）
     safe_name = safe_name.replace("..", "_")
@@ -118,7 +237,7 @@ def rotate_api():
     global API_INDEX
     API_INDEX = (API_INDEX + 1) % len(BASE_URLS)
     # 统一使用日志记录 API 切换
-    log_message_sync(f"[ASMR API] 切换到 API: {BASE_URLS[API_INDEX]}")
+    _log_enqueue(f"[ASMR API] 切换到 API: {BASE_URLS[API_INDEX]}")
 
 
 def get_current_api():
@@ -126,8 +245,9 @@ def get_current_api():
     return BASE_URLS[API_INDEX]
 
 
-async def fetch_with_retry(session: aiohttp.ClientSession, url_path: str, params=None, max_retries=4):
-    """带重试机制的API请求"""
+async def fetch_with_retry(session: aiohttp.ClientSession, url_path: str, params=None, max_retries=4,
+                           base_delay=1.0, max_delay=30.0, jitter=0.5):
+    """带重试机制的API请求（指数退避 + 抖动，尊重 429 的 Retry-After）"""
     api_headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
         "Origin": "https://asmr.one",
@@ -136,24 +256,44 @@ async def fetch_with_retry(session: aiohttp.ClientSession, url_path: str, params
     }
 
     # 每次重试时都需要最新的代理配置
-    config = load_config()
+    config = get_cached_config()
     proxy = config.get("proxy", None)
 
-    for _ in range(max_retries):
+    for attempt in range(max_retries):
         current_api = get_current_api()
         url = f"{current_api}{url_path}"
+        # 指数退避 + 随机抖动，避免重试风暴同时打到各端点
+        delay = min(base_delay * 2 ** attempt, max_delay) * (1 + random.random() * jitter)
         try:
 
             async with session.get(url, params=params, timeout=10, proxy=proxy) as response:
                 if response.status == 200:
-                    return await response.json()
-
-                await log_message(f"API {current_api} returned status {response.status} for {url_path}")
-                rotate_api()
+                    # 绕过 response.json() 的 charset 探测，直接用 _loads 解析原始字节
+                    return _loads(await response.read())
+
+                status = response.status
+                await log_message(f"API {current_api} returned status {status} for {url_path}")
+
+                if status in (401, 403, 404):
+                    # 不可恢复的错误（资源不存在/无权限），重试没有意义
+                    return None
+
+                if status == 429:
+                    # 被限流：在同一端点上退避，优先使用服务端给出的 Retry-After
+                    retry_after = response.headers.get("Retry-After")
+                    try:
+                        delay = min(float(retry_after), max_delay)
+                    except (TypeError, ValueError):
+                        pass
+                else:
+                    # 5xx 等服务端错误才切换端点
+                    rotate_api()
         except Exception as e:
             await log_message(f"API {current_api} request failed for {url_path}: {type(e).__name__}: {str(e)}")
             rotate_api()
-            await asyncio.sleep(1)  # 短暂等待后重试
+
+        if attempt < max_retries - 1:
+            await asyncio.sleep(delay)
 
     await log_message(f"All API attempts failed for {url_path}.")
     return None
@@ -161,6 +301,10 @@ async def fetch_with_retry(session: aiohttp.ClientSession, url_path: str, params
 
 # --- 核心逻辑：文件信息解析 (V2 - 保留文件夹结构) ---
 
+# HQ 音频的常见扩展名（模块级常量；集合成员判断比逐后缀 endswith 快）
+HQ_EXT = {"flac", "wav", "mp3"}
+
+
 def recursively_transform_data_v2(
         data: List[Dict[str, Any]],
         all_files: List[Dict[str, Any]],
@@ -169,48 +313,57 @@ def recursively_transform_data_v2(
         config: Dict[str, Any]
 ) -> int:
     """
-    递归遍历 API JSON 结构，收集所有文件信息并保留文件夹路径。
+    深度优先遍历 API JSON 结构，收集所有文件信息并保留文件夹路径。
+    用显式栈代替递归，避免深层目录树的函数调用开销（函数名沿用旧接口）。
     返回下一个可用的文件索引。
     """
     current_index = index_start
     hq_only = config.get("hq_audio_only", False)
     allowed_types = set(config.get("default_file_types", ["audio"]))
 
-    for item in data:
+    # 栈元素：(迭代器, 进入该层时已拼好的文件夹路径字符串)。
+    # 路径在进入文件夹时拼一次，不再为每个文件重复 join；
+    # 迭代器栈保证遍历顺序与原递归版完全一致。
+    stack: List[Tuple[Any, str]] = [(iter(data), "/".join(current_folder_path))]
+
+    while stack:
+        items_iter, folder_path_str = stack[-1]
+        item = next(items_iter, None)
+        if item is None:
+            stack.pop()
+            continue
+
         item_type = item.get("type")
         item_title = item.get("title")
 
         if item_type == "folder":
-            new_path = current_folder_path + [item_title]
-            if "children" in item and item["children"] is not None:
-                # 递归调用，并更新索引
-                current_index = recursively_transform_data_v2(
-                    item["children"], all_files, new_path, current_index, config
-                )
+            children = item.get("children")
+            if children:
+                sub_path = f"{folder_path_str}/{item_title}" if folder_path_str else item_title
+                stack.append((iter(children), sub_path))
 
         # 仅处理允许的类型
         elif item_type in allowed_types:
+            size = item.get("size", 0)
 
-            # 判断是否是 HQ 音频 (常见的 HQ 格式)
-            is_hq = item_title.lower().endswith((".flac", ".wav", ".mp3"))
+            # 判断是否是 HQ 音频 (常见的 HQ 格式)：只切出扩展名做一次集合查找，
+            # 不必为整个标题构造小写副本
+            is_hq = item_title.rpartition(".")[2].lower() in HQ_EXT
             # 兼容：如果 size 很大，也可能是 HQ
-            is_hq_by_size = item.get("size", 0) > (50 * 1024 * 1024)  # 假设大于 50MB 可能是 HQ
+            is_hq_by_size = size > (50 * 1024 * 1024)  # 假设大于 50MB 可能是 HQ
 
             # 如果配置为只下载 HQ 且当前是音频但不是 HQ，则跳过
             if hq_only and item_type == "audio" and not (is_hq or is_hq_by_size):
                 continue
 
-            # 构建当前文件的完整文件夹路径（相对于 RJ ID 目录）
-            # 注意：这里使用 '/' 作为分隔符，保存时会转换为系统路径
-            folder_path_str = "/".join(current_folder_path)
-
+            # 注意：folder_path 使用 '/' 作为分隔符，保存时会转换为系统路径
             file_info = {
                 "index": current_index,
                 "filename": item_title,
                 "url": item.get("mediaDownloadUrl"),
                 "type": item_type,
-                "size": item.get("size", 0),
-                "size_formatted": format_size(item.get("size", 0)),
+                "size": size,
+                "size_formatted": format_size(size),
                 "folder_path": folder_path_str,  # 保留文件夹路径
             }
             all_files.append(file_info)
@@ -219,61 +372,262 @@ def recursively_transform_data_v2(
     return current_index
 
 
-async def get_work_info_async(rj_id: str) -> Tuple[List[Dict[str, Any]], str]:
+async def _get_work_info(session: aiohttp.ClientSession, rj_id: str) -> Tuple[List[Dict[str, Any]], str]:
+    """get_work_info_async 的主体逻辑，session 由调用方管理"""
+    work_id = rj_id.replace('RJ', '')
+    work_info_path = f"/api/workInfo/{work_id}"
+    tracks_path = f"/api/tracks/{work_id}?v=2"
+
+    # 作品信息（标题）和音轨信息（文件结构）互不依赖，并发请求省一次 RTT
+    work_data, tracks_data = await asyncio.gather(
+        fetch_with_retry(session, work_info_path),
+        fetch_with_retry(session, tracks_path)
+    )
+
+    if work_data is None or "title" not in work_data:
+        await log_message(f"Failed to get work info for {rj_id}.")
+        return [], "作品信息获取失败或资源不存在。"
+
+    work_title = work_data.get("title", f"Work_{rj_id}")
+
+    if tracks_data is None:
+        await log_message(f"Failed to get tracks for {rj_id}.")
+        return [], f"{work_title} (文件列表获取失败)"
+
+    # 3. 解析文件信息
+    all_files: List[Dict[str, Any]] = []
+    config = get_cached_config()
+
+    # 使用 V2 转换函数，保留文件结构
+    recursively_transform_data_v2(tracks_data, all_files, [], 1, config)
+
+    if not all_files:
+        return [], f"{work_title} (未找到符合条件的文件)"
+
+    return all_files, work_title
+
+
+# 进程内作品信息缓存：rj_id -> (过期时间戳, 文件列表, 标题)。
+# 批量任务、UI 重复查询同一作品时直接命中内存，不再打 API
+_WORK_CACHE: Dict[str, Tuple[float, List[Dict[str, Any]], str]] = {}
+_WORK_CACHE_TTL = 600.0
+_WORK_CACHE_MAX = 128
+
+
+def invalidate_work_cache(rj_id: str | None = None):
+    """失效作品信息缓存；不传 rj_id 时清空全部（例如文件过滤配置变更后）"""
+    if rj_id is None:
+        _WORK_CACHE.clear()
+    else:
+        _WORK_CACHE.pop(rj_id, None)
+
+
+async def get_work_info_async(rj_id: str, session: aiohttp.ClientSession | None = None) -> Tuple[List[Dict[str, Any]], str]:
     """
     获取作品文件列表，并返回作品标题。
-    返回 (文件信息列表, 作品标题或错误信息)
+    返回 (文件信息列表, 作品标题或错误信息)。
+    传入 session 时复用调用方的连接池，否则为本次调用临时创建。
+    成功结果缓存 _WORK_CACHE_TTL 秒，可用 invalidate_work_cache 手动失效。
     """
+    cached = _WORK_CACHE.get(rj_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
     await log_message(f"Fetching info for {rj_id}...")
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # 1. 获取作品信息（用于获取标题）
-            work_info_path = f"/api/workInfo/{rj_id.replace('RJ', '')}"
-            work_data = await fetch_with_retry(session, work_info_path)
+        if session is not None:
+            files, title = await _get_work_info(session, rj_id)
+        else:
+            async with aiohttp.ClientSession() as own_session:
+                files, title = await _get_work_info(own_session, rj_id)
 
-            if work_data is None or "title" not in work_data:
-                await log_message(f"Failed to get work info for {rj_id}.")
-                return [], "作品信息获取失败或资源不存在。"
+        if files:
+            # 简单的 FIFO 淘汰，防止长时间运行后缓存无限增长
+            while len(_WORK_CACHE) >= _WORK_CACHE_MAX:
+                _WORK_CACHE.pop(next(iter(_WORK_CACHE)))
+            _WORK_CACHE[rj_id] = (time.monotonic() + _WORK_CACHE_TTL, files, title)
 
-            work_title = work_data.get("title", f"Work_{rj_id}")
+        return files, title
 
-            # 2. 获取音轨信息（用于获取文件结构）
-            tracks_path = f"/api/tracks/{rj_id.replace('RJ', '')}?v=2"
-            tracks_data = await fetch_with_retry(session, tracks_path)
+    except Exception as e:
+        await log_message(f"Critical error in get_work_info_async for {rj_id}: {e}")
+        return [], f"系统错误: {e}"
 
-            if tracks_data is None:
-                await log_message(f"Failed to get tracks for {rj_id}.")
-                return [], f"{work_title} (文件列表获取失败)"
 
-            # 3. 解析文件信息
-            all_files: List[Dict[str, Any]] = []
-            config = load_config()
+# 写缓冲上限：chunk 先积累到该大小再做一次线程池写盘
+_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
 
-            # 使用 V2 转换函数，保留文件结构
-            recursively_transform_data_v2(tracks_data, all_files, [], 1, config)
+# 进度回调的最小时间间隔（秒）
+_PROGRESS_INTERVAL = 0.25
 
-            if not all_files:
-                return [], f"{work_title} (未找到符合条件的文件)"
+# 多连接分段下载：超过该大小的全新下载尝试并发 Range 请求
+_SEGMENT_THRESHOLD = 32 * 1024 * 1024
+_SEGMENT_SIZE = 16 * 1024 * 1024
+_MAX_SEGMENTS = 4
 
-            return all_files, work_title
 
-    except Exception as e:
-        await log_message(f"Critical error in get_work_info_async for {rj_id}: {e}")
-        return [], f"系统错误: {e}"
+def _write_all(fd: int, data: bytes):
+    """把 data 完整写入 fd（处理可能的部分写）"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+# 可选的 io_uring 写盘后端：仅在 Linux 且安装了 liburing 时可用，
+# 配置 writer_backend 为 "uring" 启用；否则回退到线程池 os.write
+try:
+    import liburing  # type: ignore
+    _HAS_LIBURING = os.name == "posix"
+except ImportError:
+    liburing = None
+    _HAS_LIBURING = False
+
+
+def _write_all_uring(fd: int, data: bytes):
+    """
+    经 io_uring 写入 fd（偏移 -1 沿用文件当前位置 / O_APPEND）。
+    与 _write_all 一样循环处理部分写，直到整个缓冲区落盘。
+    """
+    ring = liburing.io_uring()
+    try:
+        liburing.io_uring_queue_init(2, ring, 0)
+        buf = bytearray(data)
+        view = memoryview(buf)
+        offset = 0
+        cqe = liburing.io_uring_cqe()
+        while offset < len(buf):
+            iov = liburing.iovec(view[offset:])
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_writev(sqe, fd, iov, len(iov), -1)
+            liburing.io_uring_submit(ring)
+            liburing.io_uring_wait_cqe(ring, cqe)
+            res = cqe.res
+            liburing.io_uring_cqe_seen(ring, cqe)
+            if res < 0:
+                raise OSError(-res, os.strerror(-res))
+            if res == 0:
+                # 防御：0 字节写意味着无法推进，直接报错而非死循环
+                raise OSError(f"io_uring wrote 0 bytes at offset {offset}")
+            offset += res
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+
+def _select_writer(config: Dict[str, Any]) -> Callable[[int, bytes], None]:
+    """根据配置选择写盘后端，io_uring 不可用时静默回退"""
+    if config.get("writer_backend") == "uring" and _HAS_LIBURING:
+        return _write_all_uring
+    return _write_all
+
+
+def _build_connector(config: Dict[str, Any]) -> aiohttp.TCPConnector:
+    """
+    构建下载用的连接器：总连接数不设上限，由 limit_per_host 控制对
+    单个主机的并发连接，避免高并发配置冲穿 API 的速率限制。
+    """
+    return aiohttp.TCPConnector(
+        limit=0,
+        limit_per_host=int(config.get("limit_per_host", 16)),
+        force_close=False,
+        enable_cleanup_closed=True,
+        ttl_dns_cache=300,
+        keepalive_timeout=60
+    )
 
 
 # --- 核心逻辑：文件下载 ---
 
+async def _download_segmented(
+        session: aiohttp.ClientSession,
+        file_url: str,
+        part_path: Path,
+        expected_size: int,
+        headers: Dict[str, str],
+        proxy: str | None,
+        chunk_size: int,
+        progress_callback: Callable[[str, str, int, int], None],
+        rj_id: str,
+        file_name: str
+) -> bool:
+    """
+    多连接分段下载：把文件切成若干段并发 Range GET，经 os.pwrite 写入各自偏移。
+    服务器不支持 Range 或任一段未取完时返回 False，由调用方回退单连接下载。
+    """
+    # 先用 1 字节的 Range 请求探测服务器是否支持分段
+    probe_headers = dict(headers)
+    probe_headers['Range'] = 'bytes=0-0'
+    async with session.get(file_url, headers=probe_headers, proxy=proxy) as probe:
+        if probe.status != 206:
+            return False
+
+    num_segments = min(_MAX_SEGMENTS, ceil(expected_size / _SEGMENT_SIZE))
+    segment_len = ceil(expected_size / num_segments)
+    loop = asyncio.get_running_loop()
+
+    downloaded = [0]  # 各段共享的进度计数
+    next_update = [loop.time() + _PROGRESS_INTERVAL]
+
+    def _report(n: int):
+        downloaded[0] += n
+        now = loop.time()
+        if now >= next_update[0]:
+            next_update[0] = now + _PROGRESS_INTERVAL
+            progress_callback(rj_id, file_name, downloaded[0], expected_size)
+
+    async def _fetch_segment(start: int, end: int) -> bool:
+        seg_headers = dict(headers)
+        seg_headers['Range'] = f'bytes={start}-{end}'
+        offset = start
+        async with session.get(file_url, headers=seg_headers, proxy=proxy) as response:
+            if response.status != 206:
+                return False
+            async for chunk in response.content.iter_chunked(chunk_size):
+                # pwrite 带偏移写入，各段互不干扰，无需锁
+                await loop.run_in_executor(None, os.pwrite, fd, chunk, offset)
+                offset += len(chunk)
+                _report(len(chunk))
+        return offset == end + 1
+
+    fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, expected_size)
+            except OSError:
+                pass
+
+        # return_exceptions=True 保证 gather 等到所有段都结束才返回：
+        # 某段抛异常时绝不能提前关闭 fd，否则其余段会 pwrite 到已关闭
+        # （甚至被复用的）描述符上
+        results = await asyncio.gather(*(
+            _fetch_segment(i * segment_len, min((i + 1) * segment_len, expected_size) - 1)
+            for i in range(num_segments)
+        ), return_exceptions=True)
+    finally:
+        os.close(fd)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            _log_enqueue(f"Segment failed for {file_name}: {type(result).__name__}: {result}")
+
+    return all(result is True for result in results)
+
+
 async def download_worker(
         session: aiohttp.ClientSession,
         semaphore: asyncio.Semaphore,
         file_info: Dict[str, Any],
         base_dir: Path,
         progress_callback: Callable[[str, str, int, int], None],
-        rj_id: str
+        rj_id: str,
+        skip_mkdir: bool = False
 ) -> bool:
-    """处理单个文件的下载，支持断点续传"""
+    """
+    处理单个文件的下载，支持断点续传。
+    调用方已批量预建目录时传 skip_mkdir=True，省掉每个文件一次 mkdir 系统调用。
+    """
     file_url = file_info.get('url')
     file_name = file_info['filename']
     expected_size = file_info.get('size', 0)
@@ -286,35 +640,46 @@ async def download_worker(
 
     # full_path 现在是: base_dir / safe_folder_path / safe_file_name
     full_path = base_dir / safe_folder_path / safe_file_name
+    # 下载数据先写入 .part 临时文件，成功后原子重命名为最终文件名，
+    # 最终文件名存在即意味着文件完整
+    part_path = full_path.with_suffix(full_path.suffix + ".part")
 
     mode = 'wb'
     headers_range = {}
     downloaded_size = 0
 
-    full_path.parent.mkdir(parents=True, exist_ok=True)
+    if not skip_mkdir:
+        full_path.parent.mkdir(parents=True, exist_ok=True)
 
     if full_path.exists():
         downloaded_size = full_path.stat().st_size
-        if expected_size > 0 and downloaded_size == expected_size:
-            log_message_sync(f"File already exists (skipping): {file_name}")
-            progress_callback(rj_id, file_name, expected_size, expected_size)
+        if expected_size <= 0 or downloaded_size == expected_size:
+            _log_enqueue(f"File already exists (skipping): {file_name}")
+            progress_callback(rj_id, file_name, downloaded_size, downloaded_size)
             return True
-        elif downloaded_size < expected_size:
+        # 大小不符：多半是旧版本直接写最终路径留下的残留，移到 .part 继续续传
+        os.replace(full_path, part_path)
+        downloaded_size = 0
+
+    if part_path.exists():
+        downloaded_size = part_path.stat().st_size
+        if expected_size > 0 and 0 < downloaded_size < expected_size:
             mode = 'ab'
             headers_range['Range'] = f'bytes={downloaded_size}-'
-            log_message_sync(f"Resuming download: {file_name}, from {format_size(downloaded_size)}")
+            _log_enqueue(f"Resuming download: {file_name}, from {format_size(downloaded_size)}")
         else:
-            # 文件大小异常，重新下载
-            full_path.unlink(missing_ok=True)
+            # 临时文件大小异常，重新下载
+            part_path.unlink(missing_ok=True)
             downloaded_size = 0
 
     current_downloaded = downloaded_size
 
+    # 在进入信号量临界区前就拿到代理配置，缩短占用下载并发额度的时间
+    config = get_cached_config()
+    proxy = config.get("proxy", None)
+
     async with semaphore:
         try:
-            config = load_config()
-            proxy = config.get("proxy", None)
-
             download_headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
                 "Referer": "https://asmr.one/"
@@ -322,6 +687,28 @@ async def download_worker(
             if headers_range:
                 download_headers.update(headers_range)
 
+            chunk_size = int(config.get("download_chunk_kb", 1024)) * 1024
+
+            # 大文件的全新下载尝试多连接分段；失败则静默回退单连接整档下载
+            if mode == 'wb' and expected_size > _SEGMENT_THRESHOLD:
+                try:
+                    segmented_ok = await _download_segmented(
+                        session, file_url, part_path, expected_size, download_headers,
+                        proxy, chunk_size, progress_callback, rj_id, file_name
+                    )
+                except Exception as e:
+                    _log_enqueue(f"Segmented download failed (falling back): {file_name}, {e}")
+                    segmented_ok = False
+
+                if segmented_ok:
+                    os.replace(part_path, full_path)
+                    progress_callback(rj_id, file_name, expected_size, expected_size)
+                    _log_enqueue(f"Download successful: {file_name}")
+                    return True
+
+                # 分段未完成：清掉残留的临时文件，走单连接路径重下
+                part_path.unlink(missing_ok=True)
+
             async with session.get(file_url, headers=download_headers, proxy=proxy) as response:
                 response.raise_for_status()
 
@@ -333,47 +720,126 @@ async def download_worker(
                 if total_size == 0 and expected_size > 0:
                     total_size = expected_size
 
-                log_message_sync(f"Starting download: {file_name} (Total size {format_size(total_size)})")
-
-                # 使用 aiofiles.open 进行异步文件操作
-                async with aiofiles.open(full_path, mode) as f:
-                    chunk_size = 8192
-                    update_counter = 0
+                _log_enqueue(f"Starting download: {file_name} (Total size {format_size(total_size)})")
+
+                # 缓冲写入：chunk 先在内存积累，满 _WRITE_BUFFER_SIZE 再经线程池
+                # 一次性 os.write，省去 aiofiles 每个 chunk 一次的线程往返
+                loop = asyncio.get_running_loop()
+                write_all = _select_writer(config)
+                flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if mode == 'ab' else os.O_TRUNC)
+                fd = os.open(part_path, flags, 0o644)
+                preallocated = False
+                write_buffer = bytearray()
+                try:
+                    # 已知总大小时预分配磁盘空间，减少碎片（非 POSIX 平台没有该调用）
+                    if mode == 'wb' and expected_size > 0 and hasattr(os, "posix_fallocate"):
+                        try:
+                            os.posix_fallocate(fd, 0, expected_size)
+                            preallocated = True
+                        except OSError:
+                            pass
+
+                    # 大块读取：每 GB 从 ~13 万次事件循环往返降到 ~1 千次
+                    next_update = loop.time() + _PROGRESS_INTERVAL
                     async for chunk in response.content.iter_chunked(chunk_size):
-                        await f.write(chunk)
+                        write_buffer += chunk
                         current_downloaded += len(chunk)
-                        update_counter += 1
 
-                        # 每 50 次迭代更新一次进度条，减少 UI 压力
-                        if update_counter % 50 == 0:
+                        if len(write_buffer) >= _WRITE_BUFFER_SIZE:
+                            await loop.run_in_executor(None, write_all, fd, bytes(write_buffer))
+                            write_buffer.clear()
+
+                        # 按时间节流进度回调：无论网速快慢，更新频率都稳定
+                        now = loop.time()
+                        if now >= next_update:
+                            next_update = now + _PROGRESS_INTERVAL
                             progress_callback(rj_id, file_name, current_downloaded, total_size)
 
+                    # 收尾：写掉缓冲区剩余数据
+                    if write_buffer:
+                        await loop.run_in_executor(None, write_all, fd, bytes(write_buffer))
+                        write_buffer.clear()
+                finally:
+                    try:
+                        # 截掉 fallocate 预留的零填充尾部——中途异常时也必须执行，
+                        # 否则 .part 停在 expected_size，续传判断会整档重下。
+                        # 只能截到真正落盘的字节数：异常时 write_buffer 里
+                        # 可能还有未写入的数据，不能计入
+                        if preallocated:
+                            flushed = current_downloaded - len(write_buffer)
+                            if flushed != expected_size:
+                                os.ftruncate(fd, flushed)
+                    finally:
+                        os.close(fd)
+
+                # 下载完整后原子替换到最终文件名；失败/中断时 .part 留待续传
+                os.replace(part_path, full_path)
+
                 # 最终更新进度条至 100%
                 progress_callback(rj_id, file_name, total_size, total_size)
 
-            log_message_sync(f"Download successful: {file_name}")
+            _log_enqueue(f"Download successful: {file_name}")
             return True
 
         except aiohttp.ClientResponseError as e:
-            log_message_sync(f"Download failed (HTTP {e.status}): {file_name}")
+            _log_enqueue(f"Download failed (HTTP {e.status}): {file_name}")
             return False
         except Exception as e:
             # NameError: aiofiles 应该在安装库后解决
-            log_message_sync(f"Download failed (Unknown error): {file_name}, {e}")
+            _log_enqueue(f"Download failed (Unknown error): {file_name}, {e}")
             return False
 
 
+async def _run_download_job(
+        session: aiohttp.ClientSession,
+        rj_id: str,
+        selected_files: List[Dict[str, Any]],
+        base_dir: Path,
+        max_concurrent_downloads: int,
+        progress_callback: Callable[[str, str, int, int], None]
+) -> bool:
+    """process_download_job 的主体逻辑，session 由调用方管理"""
+    semaphore = asyncio.Semaphore(max_concurrent_downloads)
+
+    # 去重后一次性预建所有目标目录，worker 里就不必每个文件都 mkdir
+    unique_dirs = {
+        base_dir / Path(sanitize_filename(f.get("folder_path", "")).replace("/", os.sep))
+        for f in selected_files
+    }
+    for d in unique_dirs:
+        d.mkdir(parents=True, exist_ok=True)
+
+    download_tasks = [
+        download_worker(session, semaphore, f, base_dir, progress_callback, rj_id, skip_mkdir=True)
+        for f in selected_files
+    ]
+
+    results = await asyncio.gather(*download_tasks)
+    success_count = sum(results)
+
+    await log_message(f"Download summary for {rj_id}: {success_count}/{len(selected_files)} succeeded.")
+
+    return success_count == len(selected_files)
+
+
 async def process_download_job(
         rj_id: str,
         selected_indices: List[int],
-        progress_callback: Callable[[str, str, int, int], None]
+        progress_callback: Callable[[str, str, int, int], None],
+        session: aiohttp.ClientSession | None = None,
+        preloaded_files: List[Dict[str, Any]] | None = None
 ) -> bool:
     """
     主下载逻辑，执行选中的下载任务。
+    传入 session 时复用调用方的连接池（批量任务共享 TCP/TLS 连接）；
+    传入 preloaded_files 时直接使用已获取的文件列表，省掉一轮 API 往返。
     """
     await log_message(f"Processing download job for {rj_id}, indices: {selected_indices}")
 
-    files_info_dicts, _ = await get_work_info_async(rj_id)
+    if preloaded_files is not None:
+        files_info_dicts = preloaded_files
+    else:
+        files_info_dicts, _ = await get_work_info_async(rj_id, session=session)
 
     selected_files = [f for f in files_info_dicts if f['index'] in selected_indices]
 
@@ -381,7 +847,7 @@ async def process_download_job(
         await log_message(f"No valid files selected for {rj_id}.")
         return False
 
-    config = load_config()
+    config = get_cached_config()
     max_concurrent_downloads = config.get("max_concurrent_downloads", 3)
 
     base_dir = Path(config["output_dir"]) / rj_id.upper()
@@ -389,20 +855,13 @@ async def process_download_job(
 
     await log_message(f"Starting {len(selected_files)} downloads into {base_dir.as_posix()}")
 
-    async with aiohttp.ClientSession() as session:
-        semaphore = asyncio.Semaphore(max_concurrent_downloads)
-
-        download_tasks = [
-            download_worker(session, semaphore, f, base_dir, progress_callback, rj_id)
-            for f in selected_files
-        ]
+    if session is not None:
+        return await _run_download_job(session, rj_id, selected_files, base_dir,
+                                       max_concurrent_downloads, progress_callback)
 
-        results = await asyncio.gather(*download_tasks)
-        success_count = sum(results)
-
-        await log_message(f"Download summary for {rj_id}: {success_count}/{len(selected_files)} succeeded.")
-
-        return success_count == len(selected_files)
+    async with aiohttp.ClientSession(connector=_build_connector(config)) as own_session:
+        return await _run_download_job(own_session, rj_id, selected_files, base_dir,
+                                       max_concurrent_downloads, progress_callback)
 
 
 # --- 核心逻辑：批量下载作品 (顺序下载作品) ---
@@ -413,7 +872,7 @@ async def process_bulk_download_job(
 ) -> Tuple[bool, str]:
     """
     主逻辑：批量下载指定 RJ ID 列表中的作品。
-    作品按顺序下载，每个作品内的文件并发下载。
+    作品间以 max_parallel_works 为上限并发处理，每个作品内的文件并发下载。
     """
     total_works = len(rj_ids)
 
@@ -423,61 +882,113 @@ async def process_bulk_download_job(
     await log_message(f"Starting bulk download for {total_works} works: {rj_ids[:5]}...")
 
     # 初始状态更新
-    overall_progress_callback(0, total_works, f"找到 {total_works} 个作品。开始按顺序处理...")
-
-    success_count = 0
-
-    # 2. 循环下载每个作品 (顺序执行)
-    for i, rj_id in enumerate(rj_ids):
-        current_index = i + 1
+    overall_progress_callback(0, total_works, f"找到 {total_works} 个作品。开始处理...")
 
-        # 1. 获取作品文件列表
-        files_info_dicts, work_title = await get_work_info_async(rj_id)
+    config = get_cached_config()
+    max_parallel_works = config.get("max_parallel_works", 2)
+    semaphore = asyncio.Semaphore(max_parallel_works)
 
-        if not files_info_dicts:
-            await log_message(f"Skipping {rj_id} ({work_title}): No files found or failed to retrieve.")
-            overall_progress_callback(current_index, total_works,
-                                      f"[{current_index}/{total_works}] 跳过 {rj_id} ({work_title})：未找到文件。")
-            continue
-
-        # 2. 自动选择所有文件的索引
-        selected_indices = [f['index'] for f in files_info_dicts]
+    # 预取所有作品的元数据：把 O(N·RTT) 的串行 API 往返压成受限并发
+    metadata_semaphore = asyncio.Semaphore(config.get("metadata_concurrency", 4))
 
-        overall_progress_callback(current_index, total_works,
-                                  f"[{current_index}/{total_works}] 正在下载 {rj_id} ({work_title})...")
+    async def _prefetch_info(rj_id: str):
+        async with metadata_semaphore:
+            return await get_work_info_async(rj_id, session=shared_session)
 
-        # 3. 下载作品
-        def work_progress_callback(rj_id_local: str, filename: str, downloaded: int, total: int):
-            # 将单个作品的下载进度信息传递给整体进度回调
-            def format_size_local(b):
-                if b < 1024 * 1024: return f"{b / 1024:.2f} KB"
-                if b < 1024 * 1024 * 1024: return f"{b / (1024 * 1024):.2f} MB"
-                return f"{b / (1024 * 1024 * 1024):.2f} GB"
+    completed_count = 0  # 已处理完的作品数（无论成败），用于进度显示
 
-            progress_msg = (
-                f"[{current_index}/{total_works}] {rj_id_local} - {work_title} | 文件 {filename[:20]}... | "
-                f"{format_size_local(downloaded)}/{format_size_local(total)}"
-            )
-            overall_progress_callback(current_index, total_works, progress_msg)
+    async def process_one_work(rj_id: str, prefetched) -> bool:
+        """处理单个作品：获取文件列表并全部下载。保证不向外抛异常，以免取消其它作品。"""
+        nonlocal completed_count
 
         try:
-            # process_download_job 在循环中顺序调用，实现了作品间的顺序下载
-            success = await process_download_job(rj_id, selected_indices, work_progress_callback)
+            return await _process_one_work_inner(rj_id, prefetched)
+        except Exception as e:
+            await log_message(f"Unexpected error processing {rj_id}: {e}")
+            completed_count += 1
+            overall_progress_callback(completed_count, total_works,
+                                      f"[{completed_count}/{total_works}] ❌ {rj_id} 发生错误。")
+            return False
 
+    async def _process_one_work_inner(rj_id: str, prefetched) -> bool:
+        nonlocal completed_count
+
+        async with semaphore:
+            # 1. 获取作品文件列表（优先使用预取的元数据，预取失败则重试一次）
+            if isinstance(prefetched, tuple):
+                files_info_dicts, work_title = prefetched
+            else:
+                files_info_dicts, work_title = await get_work_info_async(rj_id, session=shared_session)
+
+            if not files_info_dicts:
+                await log_message(f"Skipping {rj_id} ({work_title}): No files found or failed to retrieve.")
+                completed_count += 1
+                overall_progress_callback(completed_count, total_works,
+                                          f"[{completed_count}/{total_works}] 跳过 {rj_id} ({work_title})：未找到文件。")
+                return False
+
+            # 2. 自动选择所有文件的索引
+            selected_indices = [f['index'] for f in files_info_dicts]
+
+            overall_progress_callback(completed_count, total_works,
+                                      f"[{completed_count}/{total_works}] 正在下载 {rj_id} ({work_title})...")
+
+            # 3. 下载作品
+            # 消息前缀只与作品有关，提前拼好；回调里只格式化变化的部分
+            msg_prefix = f"[{completed_count}/{total_works}] {rj_id} - {work_title} | 文件 "
+
+            def work_progress_callback(rj_id_local: str, filename: str, downloaded: int, total: int):
+                # 将单个作品的下载进度信息传递给整体进度回调
+                progress_msg = (
+                    f"{msg_prefix}{filename[:20]}... | "
+                    f"{format_size(downloaded)}/{format_size(total)}"
+                )
+                overall_progress_callback(completed_count, total_works, progress_msg)
+
+            success = False
+            try:
+                # 复用预取/刚获取的文件列表，避免 process_download_job 再查一遍 API
+                success = await process_download_job(rj_id, selected_indices, work_progress_callback,
+                                                     session=shared_session,
+                                                     preloaded_files=files_info_dicts)
+            except Exception as e:
+                await log_message(f"Error during bulk download of {rj_id}: {e}")
+
+            completed_count += 1
             if success:
-                success_count += 1
-                overall_progress_callback(current_index, total_works,
-                                          f"[{current_index}/{total_works}] ✅ {rj_id} ({work_title}) 下载成功！")
+                overall_progress_callback(completed_count, total_works,
+                                          f"[{completed_count}/{total_works}] ✅ {rj_id} ({work_title}) 下载成功！")
             else:
-                overall_progress_callback(current_index, total_works,
-                                          f"[{current_index}/{total_works}] ❌ {rj_id} ({work_title}) 下载失败。")
-
-        except Exception as e:
-            await log_message(f"Error during bulk download of {rj_id}: {e}")
-            overall_progress_callback(current_index, total_works,
-                                      f"[{current_index}/{total_works}] ❌ {rj_id} ({work_title}) 发生错误。")
+                overall_progress_callback(completed_count, total_works,
+                                          f"[{completed_count}/{total_works}] ❌ {rj_id} ({work_title}) 下载失败。")
+
+            return success
+
+    # 整个批量任务共享一个连接池：每个主机只握手一次 TLS，DNS 结果缓存复用
+    connector = _build_connector(config)
+
+    async with aiohttp.ClientSession(connector=connector) as shared_session:
+        overall_progress_callback(0, total_works, f"正在预取 {total_works} 个作品的元数据...")
+        prefetched_infos = await asyncio.gather(
+            *(_prefetch_info(rj_id) for rj_id in rj_ids), return_exceptions=True
+        )
+
+        # 并发处理所有作品（受 semaphore 限制）。不用 TaskGroup 以兼容
+        # Python 3.10（README 的最低支持版本）；整体出错/被取消时显式
+        # 撤销未完成的子任务并等它们退出，保持与 TaskGroup 相同的语义
+        tasks = [
+            asyncio.ensure_future(process_one_work(rj_id, prefetched))
+            for rj_id, prefetched in zip(rj_ids, prefetched_infos)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-        await asyncio.sleep(1)  # 每个作品下载完成后稍作等待
+    success_count = sum(1 for r in results if r is True)
 
     final_message = f"批量下载完成。成功下载 {success_count} / {total_works} 个作品。"
     await log_message(final_message)
@@ -487,51 +998,60 @@ async def process_bulk_download_job(
 
 # --- 新功能：关键词搜索 ---
 
-async def search_work_async(keyword: str, page: int = 1, size: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+async def _search_work(session: aiohttp.ClientSession, keyword: str, page: int, size: int):
+    """search_work_async 的 API 请求部分，session 由调用方管理"""
+    keyword_encoded = keyword.strip().replace("/", "%20")
+
+    return await fetch_with_retry(
+        session,
+        f"/api/search/{keyword_encoded}",
+        params={
+            "order": "dl_count",
+            "sort": "desc",
+            "page": page,
+            "size": size,
+            "subtitle": 0,
+            "includeTranslationWorks": "true"
+        }
+    )
+
+
+async def search_work_async(keyword: str, page: int = 1, size: int = 20,
+                            session: aiohttp.ClientSession | None = None) -> Tuple[List[Dict[str, Any]], int]:
     """
     根据关键词搜索作品。
-    返回 (作品信息列表, 总页数)
+    返回 (作品信息列表, 总页数)。传入 session 时复用调用方的连接池。
     """
     await log_message(f"Searching for '{keyword}' on page {page}, size {size}")
 
     try:
-        keyword_encoded = keyword.strip().replace("/", "%20")
-
-        async with aiohttp.ClientSession() as session:
-            r = await fetch_with_retry(
-                session,
-                f"/api/search/{keyword_encoded}",
-                params={
-                    "order": "dl_count",
-                    "sort": "desc",
-                    "page": page,
-                    "size": size,
-                    "subtitle": 0,
-                    "includeTranslationWorks": "true"
-                }
-            )
-
-            if r is None or "works" not in r:
-                return [], 0
-
-            works = r["works"]
-            # 使用 size 来计算总页数
-            total_pages = ceil(r["pagination"]["totalCount"] / size) if r["pagination"][
-                                                                            "totalCount"] and size > 0 else 0
-
-            search_results = []
-            for work in works:
-                ids = str(work["id"])
-                full_rj_id = f"RJ{ids}" if not ids.startswith("RJ") else ids
-
-                search_results.append({
-                    "rj_id": full_rj_id,
-                    "title": work["title"],
-                    "author": work["name"],
-                    "total_tracks": work.get("tracksCount", 0)
-                })
-
-            return search_results, total_pages
+        if session is not None:
+            r = await _search_work(session, keyword, page, size)
+        else:
+            async with aiohttp.ClientSession() as own_session:
+                r = await _search_work(own_session, keyword, page, size)
+
+        if r is None or "works" not in r:
+            return [], 0
+
+        works = r["works"]
+        # 使用 size 来计算总页数
+        total_pages = ceil(r["pagination"]["totalCount"] / size) if r["pagination"][
+                                                                        "totalCount"] and size > 0 else 0
+
+        search_results = []
+        for work in works:
+            ids = str(work["id"])
+            full_rj_id = f"RJ{ids}" if not ids.startswith("RJ") else ids
+
+            search_results.append({
+                "rj_id": full_rj_id,
+                "title": work["title"],
+                "author": work["name"],
+                "total_tracks": work.get("tracksCount", 0)
+            })
+
+        return search_results, total_pages
 
     except Exception as e:
         await log_message(f"Critical error in search_work_async for '{keyword}': {e}")